@@ -0,0 +1,139 @@
+from __future__ import print_function
+import os
+import sys
+import time
+import requests
+
+import html_extraction
+from fomc_speeches_data import find_speeches_by_year
+
+# pages committed with the repo, so the parity check runs without network
+# access. See html_fixtures/README.md for where they come from
+FIXTURE_DIR = './html_fixtures'
+# where fetch saves live pages, to check against the current site
+LIVE_FIXTURE_DIR = './html_fixtures_live'
+BASE_URL = 'https://www.federalreserve.gov'
+CALENDAR_URL = BASE_URL + '/monetarypolicy/fomccalendars.htm'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
+}
+
+# every extraction the scrapers do, run on every saved page
+CHECKS = [
+    ('paragraphs', lambda backend, html: backend.paragraphs(html)),
+    ('article_paragraphs', lambda backend, html: backend.article_paragraphs(html, 'col-xs-12 col-sm-8 col-md-8')),
+    ('statement_links', lambda backend, html: backend.links(html, href_pattern='^/newsevents/pressreleases/monetary\\d{8}a.htm')),
+    ('statement_text_links', lambda backend, html: backend.links(html, text='Statement')),
+    ('press_conference_links', lambda backend, html: backend.links(html, text='Press Conference')),
+]
+
+
+def _save(url, filename, directory):
+    print("Saving", url)
+    response = requests.get(url, headers=HEADERS)
+    with open(os.path.join(directory, filename), 'w', encoding='utf-8') as output_file:
+        output_file.write(response.text)
+    return response.text
+
+
+def fetch_fixtures(directory=LIVE_FIXTURE_DIR, pages_per_kind=5):
+    '''
+    saves a sample of the pages the scrapers read: the meeting calendar,
+    a historical year page, statements, press conferences, a speech index
+    and speeches
+    '''
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    calendar = _save(CALENDAR_URL, 'calendar.htm', directory)
+    _save(BASE_URL + '/monetarypolicy/fomchistorical2011.htm', 'fomchistorical2011.htm', directory)
+    statements = html_extraction.links(calendar, href_pattern='^/newsevents/pressreleases/monetary\\d{8}a.htm', backend='bs4')
+    for i, link in enumerate(statements[:pages_per_kind]):
+        _save(BASE_URL + link, 'statement_{}.htm'.format(i), directory)
+    press_conferences = html_extraction.links(calendar, text='Press Conference', backend='bs4')
+    for i, link in enumerate(press_conferences[:pages_per_kind]):
+        _save(BASE_URL + link if link.startswith('/') else link, 'press_conference_{}.htm'.format(i), directory)
+
+    speech_index = '/newsevents/speech/2024-speeches.htm'
+    _save(BASE_URL + speech_index, 'speech_index.htm', directory)
+    speeches = [links[0] for links in find_speeches_by_year('www.federalreserve.gov', speech_index)[3] if links]
+    speeches = [link for link in speeches if not link.startswith('/pubs/feds')]
+    for i, link in enumerate(speeches[:pages_per_kind]):
+        _save(BASE_URL + link, 'speech_{}.htm'.format(i), directory)
+
+
+def load_fixtures(directory=FIXTURE_DIR):
+    if not os.path.isdir(directory):
+        print("No fixtures in", directory)
+        sys.exit(1)
+    pages = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.htm') or filename.endswith('.html'):
+            with open(os.path.join(directory, filename), encoding='utf-8') as input_file:
+                pages[filename] = input_file.read()
+    return pages
+
+
+def check_parity(pages, reference='bs4'):
+    '''
+    compares every backend with the BeautifulSoup output on every page.
+    Backends are called directly, so a failure is reported instead of
+    being hidden by the fallback. Only backends in PARITY_BACKENDS count
+    towards the returned number of mismatches, differences from the others
+    (lxml) are printed for information
+    '''
+    mismatches = 0
+    for name, backend in html_extraction.BACKENDS.items():
+        if name == reference:
+            continue
+        required = name in html_extraction.PARITY_BACKENDS
+        differences = 0
+        for filename, html in pages.items():
+            for check, extract in CHECKS:
+                expected = extract(html_extraction.BACKENDS[reference], html)
+                try:
+                    result = extract(backend, html)
+                except Exception as e:
+                    result = 'error: {}'.format(e)
+                if result != expected:
+                    differences += 1
+                    print("{} {} {} {}".format('MISMATCH' if required else 'differs', name, filename, check))
+        if required:
+            mismatches += differences
+            print("Parity {}:".format(name), "OK" if differences == 0 else "{} mismatches".format(differences))
+        else:
+            print("Parity {} (informational):".format(name), "{} differences".format(differences))
+    return mismatches
+
+
+def benchmark(pages, repeats=3):
+    '''
+    prints pages/sec for every backend and extraction
+    '''
+    print("{:<12}".format('backend') + ''.join("{:>24}".format(check) for check, _ in CHECKS))
+    for name, backend in html_extraction.BACKENDS.items():
+        row = "{:<12}".format(name)
+        for check, extract in CHECKS:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for html in pages.values():
+                    extract(backend, html)
+            elapsed = time.perf_counter() - start
+            row += "{:>24.1f}".format(repeats * len(pages) / elapsed)
+        print(row)
+
+
+if __name__ == '__main__':
+    # Example Usage:
+    #   python benchmark_html_extraction.py                          checks parity on ./html_fixtures and prints pages/sec
+    #   python benchmark_html_extraction.py fetch                    saves live pages to ./html_fixtures_live
+    #   python benchmark_html_extraction.py ./html_fixtures_live     checks parity on the live pages
+    if len(sys.argv) > 1 and sys.argv[1] == 'fetch':
+        fetch_fixtures(sys.argv[2] if len(sys.argv) > 2 else LIVE_FIXTURE_DIR)
+    else:
+        directory = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+        pages = load_fixtures(directory)
+        print("Loaded", len(pages), "pages from", directory)
+        mismatches = check_parity(pages)
+        benchmark(pages)
+        sys.exit(1 if mismatches else 0)
@@ -23,13 +23,4 @@ df.to_csv('df_press_conferences.csv', index=True)
 
 print("Pickle file successfully converted to CSV!")
 
-# code to convert all_fed_speeches.pickle to all_fed_speeches.csv
-
-# Load the pickle file
-with open('all_fed_speeches.pickle', 'rb') as f:
-    df = pickle.load(f)
-
-# Save the DataFrame to a CSV file
-df.to_csv('all_fed_speeches.csv', index=True)
-
-print("Pickle file successfully converted to CSV!")
+# all_fed_speeches.csv is written directly by fomc_speeches_data.py, no conversion needed
@@ -1,5 +1,4 @@
 from __future__ import print_function
-from bs4 import BeautifulSoup
 import requests
 import re
 import pandas as pd
@@ -7,6 +6,8 @@ import pickle
 import threading
 import sys
 
+import html_extraction
+
 class FOMC(object):
     '''
     A convenient class for extracting meeting minutes from the FOMC website
@@ -20,7 +21,8 @@ class FOMC(object):
                  calendar_url='https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm',
                  historical_date=2011,
                  verbose=True,
-                 max_threads=10):
+                 max_threads=10,
+                 html_backend=None):
         self.base_url = base_url
         self.calendar_url = calendar_url
         self.df = None
@@ -30,6 +32,7 @@ class FOMC(object):
         self.verbose = verbose
         self.HISTORICAL_DATE = historical_date
         self.MAX_THREADS = max_threads
+        self.html_backend = html_backend
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
         }
@@ -45,19 +48,17 @@ class FOMC(object):
 
         # Open the FOMC meetings calendar page with headers to avoid the 403 error
         fomc_meetings_socket = requests.get(self.calendar_url, headers=self.headers)
-        soup = BeautifulSoup(fomc_meetings_socket.text, 'html.parser')
-
-        statements = soup.find_all('a', href=re.compile('^/newsevents/pressreleases/monetary\d{8}a.htm'))
-        self.links = [statement.attrs['href'] for statement in statements] 
+        self.links = html_extraction.links(fomc_meetings_socket.text,
+                                           href_pattern='^/newsevents/pressreleases/monetary\d{8}a.htm',
+                                           backend=self.html_backend)
 
         if from_year <= self.HISTORICAL_DATE:        
             for year in range(from_year, self.HISTORICAL_DATE + 1):
                 fomc_yearly_url = self.base_url + '/monetarypolicy/fomchistorical' + str(year) + '.htm'
                 fomc_yearly_socket = requests.get(fomc_yearly_url, headers=self.headers)
-                soup_yearly = BeautifulSoup(fomc_yearly_socket.text, 'html.parser')
-                statements_historical = soup_yearly.findAll('a', text='Statement')
-                for statement_historical in statements_historical:
-                    self.links.append(statement_historical.attrs['href'])
+                statements_historical = html_extraction.links(fomc_yearly_socket.text, text='Statement',
+                                                              backend=self.html_backend)
+                self.links.extend(statements_historical)
 
     def _date_from_link(self, link):
         date = re.findall('[0-9]{8}', link)[0]
@@ -81,9 +82,8 @@ class FOMC(object):
         # date of the article content
         self.dates.append(self._date_from_link(link))
         statement_socket = requests.get(self.base_url + link, headers=self.headers)
-        statement = BeautifulSoup(statement_socket.text, 'html.parser')
-        paragraphs = statement.findAll('p')
-        self.articles[index] = "\n\n".join([paragraph.get_text().strip() for paragraph in paragraphs])
+        paragraphs = html_extraction.paragraphs(statement_socket.text, backend=self.html_backend)
+        self.articles[index] = "\n\n".join(paragraphs)
 
     def _get_articles_multi_threaded(self):
         '''
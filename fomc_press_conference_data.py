@@ -1,5 +1,4 @@
 from __future__ import print_function
-from bs4 import BeautifulSoup
 import requests
 import re
 import pandas as pd
@@ -7,6 +6,8 @@ import pickle
 import threading
 import sys
 
+import html_extraction
+
 class FOMCPressConferences(object):
     '''
     A convenient class for extracting press conferences from the FOMC website
@@ -20,7 +21,8 @@ class FOMCPressConferences(object):
                  calendar_url='https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm',
                  historical_date=2011,
                  verbose=True,
-                 max_threads=10):
+                 max_threads=10,
+                 html_backend=None):
         self.base_url = base_url
         self.calendar_url = calendar_url
         self.df = None
@@ -30,6 +32,7 @@ class FOMCPressConferences(object):
         self.verbose = verbose
         self.HISTORICAL_DATE = historical_date
         self.MAX_THREADS = max_threads
+        self.html_backend = html_backend
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
         }
@@ -45,23 +48,22 @@ class FOMCPressConferences(object):
 
         # Open the FOMC meetings calendar page with headers to avoid the 403 error
         fomc_meetings_socket = requests.get(self.calendar_url, headers=self.headers)
-        soup = BeautifulSoup(fomc_meetings_socket.text, 'html.parser')
 
         # Look for links with 'Press Conference' text
-        press_conferences = soup.find_all('a', text='Press Conference')
+        press_conferences = html_extraction.links(fomc_meetings_socket.text, text='Press Conference',
+                                                  backend=self.html_backend)
         
         # Fix concatenation issue: ensuring proper handling of base URL and relative paths
-        self.links = [self.base_url + press_conference['href'] if press_conference['href'].startswith('/') else press_conference['href'] for press_conference in press_conferences]
+        self.links = [self.base_url + press_conference if press_conference.startswith('/') else press_conference for press_conference in press_conferences]
 
         if from_year <= self.HISTORICAL_DATE:        
             for year in range(from_year, self.HISTORICAL_DATE + 1):
                 fomc_yearly_url = self.base_url + '/monetarypolicy/fomchistorical' + str(year) + '.htm'
                 fomc_yearly_socket = requests.get(fomc_yearly_url, headers=self.headers)
-                soup_yearly = BeautifulSoup(fomc_yearly_socket.text, 'html.parser')
-                press_conferences_historical = soup_yearly.findAll('a', text='Press Conference')
-                for press_conference_historical in press_conferences_historical:
+                press_conferences_historical = html_extraction.links(fomc_yearly_socket.text, text='Press Conference',
+                                                                     backend=self.html_backend)
+                for link in press_conferences_historical:
                     # Apply the same logic to the historical links
-                    link = press_conference_historical['href']
                     full_link = self.base_url + link if link.startswith('/') else link
                     self.links.append(full_link)
 
@@ -87,9 +89,8 @@ class FOMCPressConferences(object):
         # date of the article content
         self.dates.append(self._date_from_link(link))
         statement_socket = requests.get(link, headers=self.headers)
-        statement = BeautifulSoup(statement_socket.text, 'html.parser')
-        paragraphs = statement.findAll('p')
-        self.articles[index] = "\n\n".join([paragraph.get_text().strip() for paragraph in paragraphs])
+        paragraphs = html_extraction.paragraphs(statement_socket.text, backend=self.html_backend)
+        self.articles[index] = "\n\n".join(paragraphs)
 
     def _get_articles_multi_threaded(self):
         '''
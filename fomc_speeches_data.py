@@ -1,3 +1,13 @@
+from __future__ import print_function
+from bs4 import BeautifulSoup
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPSConnection
+import pandas as pd
+import requests
+
+import html_extraction
+from scored_table import ChunkedTableWriter
 
 def create_url_list(start_year, end_year, prefix, suffix):
         # Generates a list of URLs for annual speech listings based on year range and URL components
@@ -20,7 +30,8 @@ def find_speeches_by_year(host, this_url, print_test=False):
     body = resp.read()
     # check that we received the correct response code
     if resp.status != 200:
-        print('Error from Web Site! Response code: ', resp.status)
+        print('Error from Web Site! Response code: ', resp.status, this_url)
+        return [], [], [], []
     else:
         soup=BeautifulSoup(body, 'html.parser')
         event_list = soup.find('div', class_='row eventlist')
@@ -33,17 +44,18 @@ def find_speeches_by_year(host, this_url, print_test=False):
         for row in event_list.find_all('div', class_='row'):
             tmp_date= [x.text for x in row.find_all('time')]
             date_lst.append(tmp_date)
-        
+
             tmp_speaker = [x.text for x in row.find_all('p', class_='news__speaker')]
             speaker_lst.append(tmp_speaker)
-        
+
             tmp_title = [x.text for x in row.find_all('em')]
             title_lst.append(tmp_title)
 
-        # some of the links include video with the transcript. We are deleteing these here
-        for link in event_list.find_all('a', href=True, class_ = lambda x: x != 'watchLive'):
-            link_lst.append(link['href'])
-        
+            # some of the links include video with the transcript. We are deleteing these here.
+            # Links are taken per row so they stay paired with the row's date, speaker and title
+            tmp_link = [x['href'] for x in row.find_all('a', href=True, class_ = lambda x: x != 'watchLive')]
+            link_lst.append(tmp_link)
+
         if print_test:
             print('length of dates: ', len(date_lst))
             print('length of speakers: ', len(speaker_lst))
@@ -52,77 +64,87 @@ def find_speeches_by_year(host, this_url, print_test=False):
 
         return date_lst, speaker_lst, title_lst, link_lst
 
+def _first(items):
+    # the parsed fields are lists of matches, we keep the first one
+    return items[0] if items else None
+
+def iter_speech_index(host, annual_htm_list, max_threads=10):
+    # Yields one record (date, speaker, title, link) per speech listed on the annual pages.
+    # The pages are fetched concurrently but records come out in the order of annual_htm_list
+
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        pages = executor.map(lambda item: find_speeches_by_year(host, item), annual_htm_list)
+        for date_lst, speaker_lst, title_lst, link_lst in pages:
+            for date, speaker, title, link in zip(date_lst, speaker_lst, title_lst, link_lst):
+                link = _first(link)
+                # removing items that are not speeches. These contain a link that starts with '/pubs/feds'
+                if link is None or link.startswith('/pubs/feds'):
+                    continue
+                if not date or not title:
+                    print('Skipping row without a date or title: ', link)
+                    continue
+                yield {'date': pd.to_datetime(_first(date)), 'speaker': _first(speaker),
+                       'title': _first(title), 'link': link}
+
+def iter_speeches(host, records, max_threads=10, html_backend=None):
+    # Yields each record with its full text added, in the order the records come in.
+    # At most max_threads documents are being fetched or waiting to be consumed at any time
+
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        pending = deque()
+        for record in records:
+            pending.append((record, executor.submit(get_one_doc, host, record['link'], html_backend)))
+            if len(pending) >= max_threads:
+                record, future = pending.popleft()
+                yield dict(record, text=future.result())
+        while pending:
+            record, future = pending.popleft()
+            yield dict(record, text=future.result())
+
+def write_speeches(records, filename, chunk_size=100, verbose=True):
+    # Streams the records to filename (csv or parquet), flushing every chunk_size rows.
+    # Returns the number of rows written
+
+    with ChunkedTableWriter(filename, chunk_size=chunk_size, verbose=verbose) as writer:
+        for record in records:
+            writer.append(record)
+    return writer.rows_written
+
 def create_speech_df(host, annual_htm_list):
     # Creates a DataFrame from the accumulated speech details across all URLs
 
-    all_dates = []
-    all_speakers = []
-    all_titles = []
-    all_links = []
-    for item in annual_htm_list:
-        date_lst, speaker_lst, title_lst, link_lst =find_speeches_by_year(host, 
-                                                    item, print_test=False)
-        all_dates = all_dates + date_lst
-        all_speakers = all_speakers + speaker_lst
-        all_titles = all_titles + title_lst
-        all_links = all_links + link_lst
-    
-    dict1 = {'date': all_dates, 'speaker':all_speakers,
-            'title': all_titles, 'link':all_links}
-    df = pd.DataFrame.from_dict(dict1)
-    
-    #Cleaning up some of the dateframe elements to remove brackets
-    df['date']=df['date'].str[0]
-    df['date'] = pd.to_datetime(df['date'])
-    df['speaker']=df['speaker'].str[0]
-    df['title']=df['title'].str[0]
-    
-    # creating empty column for documents
-    doc = np.zeros_like(df['date'])
-    df['text'] = doc
+    df = pd.DataFrame(list(iter_speech_index(host, annual_htm_list)),
+                      columns=['date', 'speaker', 'title', 'link'])
 
-    # removing items that are not speeches. These contain a link that starts with '/pubs/feds'
-    delete_these = df[df['link'].str.match('/pubs/feds')].index
-    df = df.drop(delete_these)
+    # creating empty column for documents
+    df['text'] = None
     return df
 
 def retrieve_docs(host, df):
     # Scrapes full texts for each speech and updates the DataFrame with these texts
 
-    for index, row in df.iterrows():
-        this_item = df['link'][index]
-        print('Scraping text for documents #: ', index)
-        doc = get_one_doc(host, this_item)
-        df['text'][index] = doc
+    records = df[['link']].to_dict('records')
+    df = df.copy()
+    df['text'] = [record['text'] for record in iter_speeches(host, records)]
     return df
 
-def get_one_doc(host, this_url):
+def get_one_doc(host, this_url, html_backend=None):
     # Retrieves and returns the full text content from a speech URL
 
-    
+    print('Scraping text for document: ', this_url)
     temp_url = 'https://' + host + this_url
     response = requests.get(temp_url)
-    sp = BeautifulSoup(response.text)
-    article = sp.find('div', class_='col-xs-12 col-sm-8 col-md-8')
-
-    doc = []
-    for p in article.find_all('p'):
-        doc.append(p.text)
+    doc = html_extraction.article_paragraphs(response.text, 'col-xs-12 col-sm-8 col-md-8',
+                                             backend=html_backend)
+    if doc is None:
+        print('No article found for: ', this_url)
+        return ''
 
     return_doc = ''.join(doc)
 
     return return_doc
 
 if __name__ == '__main__':
-   
-    # import functions
-    import pandas as pd 
-    import numpy as np
-    from bs4 import BeautifulSoup
-    from http.client import HTTPSConnection
-    import pickle
-    from urllib.request import urlopen
-    import requests
 
     host = 'www.federalreserve.gov'
     prefix = '/newsevents/speech/'
@@ -131,20 +153,15 @@ if __name__ == '__main__':
     end_year = 2024
 
     # create list of web site containing annual speech links
-    annual_htm_list =create_url_list(start_year, end_year, prefix, suffix)        
+    annual_htm_list =create_url_list(start_year, end_year, prefix, suffix)
     print('Below is the annual_htm_list')
     print(annual_htm_list)
-    
-    # create dataframe containing speech information (not yet the text)
-    df = create_speech_df(host, annual_htm_list)
-    #print(df.info())
-    
-    
-    # scrape the text from every speech in the dataframe
-    df = retrieve_docs(host, df)
-    print(df.info())
-
-    # saving the df to a pickle file
-    pickle_out = open('all_fed_speeches', 'wb')
-    pickle.dump(df, pickle_out)
-    pickle_out.close()
\ No newline at end of file
+
+    # stream the speech listings, fetch the text for each one and write
+    # them to disk in chunks, so memory use stays flat however many years are scraped
+    records = iter_speeches(host, iter_speech_index(host, annual_htm_list))
+    rows = write_speeches(records, './all_fed_speeches.csv')
+    if rows == 0:
+        print('No speeches were harvested, ./all_fed_speeches.csv was not written')
+    else:
+        print('Saved', rows, 'speeches to ./all_fed_speeches.csv')
@@ -0,0 +1,406 @@
+from __future__ import print_function
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+import re
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Elements that never have children. They are not pushed on the tag stack,
+# the same way BeautifulSoup's html.parser builder treats them
+VOID_ELEMENTS = {'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command',
+                 'embed', 'frame', 'hr', 'image', 'img', 'input', 'isindex',
+                 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param',
+                 'source', 'spacer', 'track', 'wbr'}
+
+# BeautifulSoup's get_text() leaves out the contents of these
+NON_TEXT_ELEMENTS = {'script', 'style', 'template', 'rt', 'rp'}
+
+# BeautifulSoup collapses whitespace-only strings to a single space or
+# newline, except inside these
+PRESERVE_WHITESPACE_ELEMENTS = {'pre', 'textarea'}
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+def _class_matches(value, div_class):
+    # same rule as BeautifulSoup's class_ filter: the whole attribute or one of its classes
+    if value is None:
+        return False
+    classes = value.split()
+    return ' '.join(classes) == div_class or div_class in classes
+
+
+def _compile(href_pattern):
+    if href_pattern is None or hasattr(href_pattern, 'search'):
+        return href_pattern
+    return re.compile(href_pattern)
+
+
+class BeautifulSoupBackend(object):
+    '''
+    Builds the full soup tree. This is what the scrapers always did and is
+    kept as the reference output and as the fallback for the other backends
+    '''
+
+    def paragraphs(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        return [paragraph.get_text().strip() for paragraph in soup.findAll('p')]
+
+    def article_paragraphs(self, html, div_class):
+        soup = BeautifulSoup(html, 'html.parser')
+        article = soup.find('div', class_=div_class)
+        if article is None:
+            return None
+        return [p.text for p in article.find_all('p')]
+
+    def links(self, html, href_pattern=None, text=None):
+        soup = BeautifulSoup(html, 'html.parser')
+        filters = {'href': _compile(href_pattern) or True}
+        if text is not None:
+            filters['string'] = text
+        return [anchor.attrs['href'] for anchor in soup.find_all('a', **filters)]
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _StreamingExtractor(HTMLParser):
+    '''
+    Walks the token stream once without building a tree. Only a stack of the
+    open tag names is kept, plus text buffers for the elements being
+    extracted. End tags close everything opened after the matching start tag,
+    like BeautifulSoup's html.parser builder, so the output is the same
+
+    Text is buffered until the next tag, comment or declaration and then
+    added as one string, with whitespace-only strings collapsed the same way
+    the soup does it
+
+    Each stack entry also counts its direct children and remembers the last
+    one's string, which is enough to work out BeautifulSoup's .string: the
+    text of an element that holds a single string, possibly through a chain
+    of single-child elements
+    '''
+
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.stack = []
+        self.results = []
+        self.data = []
+        # void elements opened with <br> rather than <br/>, whose redundant
+        # </br> is swallowed without ending the current run of text
+        self.closed_void_elements = []
+        self.non_text_depth = 0
+        self.preserve_depth = 0
+
+    def open_element(self, tag, attrs):
+        '''
+        called for every start tag. Returns a result slot number to collect
+        the element's text into, or None
+        '''
+        return None
+
+    def close_element(self, tag, slot, text, string):
+        '''
+        called when an element with a result slot is closed. string is the
+        element's .string as BeautifulSoup defines it, or None
+        '''
+        self.results[slot] = text
+
+    def new_slot(self):
+        self.results.append(None)
+        return len(self.results) - 1
+
+    def _add_child(self, string):
+        if self.stack:
+            parent = self.stack[-1]
+            parent[3] += 1
+            parent[4] = string
+
+    def _add_string(self, data, is_text):
+        if not self.preserve_depth and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        self._add_child(data)
+        if not is_text:
+            return
+        for entry in self.stack:
+            if entry[2] is not None:
+                entry[2].append(data)
+
+    def _flush_data(self):
+        '''
+        adds the buffered run of text as one string, like the soup's endData()
+        '''
+        if not self.data:
+            return
+        data = ''.join(self.data)
+        self.data = []
+        self._add_string(data, is_text=not self.non_text_depth)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, self_closing=True)
+        self.handle_endtag(tag, self_closing=True)
+
+    def handle_starttag(self, tag, attrs, self_closing=False):
+        self._flush_data()
+        slot = self.open_element(tag, dict(attrs))
+        if tag in VOID_ELEMENTS:
+            self._add_child(None)
+            if not self_closing:
+                self.closed_void_elements.append(tag)
+            return
+        # [tag, slot, text chunks, number of children, string of the last child]
+        self.stack.append([tag, slot, [] if slot is not None else None, 0, None])
+        if tag in NON_TEXT_ELEMENTS:
+            self.non_text_depth += 1
+        if tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self.preserve_depth += 1
+
+    def handle_endtag(self, tag, self_closing=False):
+        if not self_closing and tag in self.closed_void_elements:
+            self.closed_void_elements.remove(tag)
+            return
+        self._flush_data()
+        if not any(entry[0] == tag for entry in self.stack):
+            return
+        while True:
+            open_tag, slot, chunks, children, string = self.stack.pop()
+            if open_tag in NON_TEXT_ELEMENTS:
+                self.non_text_depth -= 1
+            if open_tag in PRESERVE_WHITESPACE_ELEMENTS:
+                self.preserve_depth -= 1
+            string = string if children == 1 else None
+            if slot is not None:
+                self.close_element(open_tag, slot, ''.join(chunks), string)
+            self._add_child(string)
+            if open_tag == tag:
+                return
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_comment(self, data):
+        # comments are children in the soup tree but not part of get_text()
+        self._flush_data()
+        self._add_child(data)
+
+    def handle_decl(self, data):
+        self._flush_data()
+        self._add_child(data)
+
+    def unknown_decl(self, data):
+        self._flush_data()
+        if data.upper().startswith('CDATA['):
+            # the soup keeps CDATA as text, even inside script or template
+            self._add_string(data[len('CDATA['):], is_text=True)
+        else:
+            self._add_child(data)
+
+    def handle_pi(self, data):
+        self._flush_data()
+        self._add_child(data)
+
+    def extract(self, html):
+        try:
+            self.feed(html)
+            HTMLParser.close(self)
+            self._flush_data()
+            # elements still open at the end of the page keep the text they have
+            while self.stack:
+                self.handle_endtag(self.stack[0][0])
+        except _StopParsing:
+            pass
+        return self.results
+
+
+class _ParagraphExtractor(_StreamingExtractor):
+
+    def open_element(self, tag, attrs):
+        if tag == 'p':
+            return self.new_slot()
+
+
+class _ArticleExtractor(_StreamingExtractor):
+
+    def __init__(self, div_class):
+        _StreamingExtractor.__init__(self)
+        self.div_class = div_class
+        self.found = False
+        self.article_slot = None
+
+    def open_element(self, tag, attrs):
+        if not self.found and tag == 'div' and _class_matches(attrs.get('class'), self.div_class):
+            self.found = True
+            # slot only used to know when the article div closes
+            self.article_slot = self.new_slot()
+            return self.article_slot
+        if self.found and tag == 'p':
+            return self.new_slot()
+
+    def close_element(self, tag, slot, text, string):
+        if slot == self.article_slot:
+            # nothing after the article is needed
+            raise _StopParsing()
+        self.results[slot] = text
+
+    def extract(self, html):
+        _StreamingExtractor.extract(self, html)
+        if not self.found:
+            return None
+        return [text for slot, text in enumerate(self.results) if slot != self.article_slot]
+
+
+class _LinkExtractor(_StreamingExtractor):
+
+    def __init__(self, href_pattern=None, text=None):
+        _StreamingExtractor.__init__(self)
+        self.href_pattern = _compile(href_pattern)
+        self.text = text
+        self.hrefs = {}
+
+    def open_element(self, tag, attrs):
+        href = attrs.get('href')
+        if tag != 'a' or href is None:
+            return None
+        if self.href_pattern is not None and not self.href_pattern.search(href):
+            return None
+        slot = self.new_slot()
+        self.hrefs[slot] = href
+        return slot
+
+    def close_element(self, tag, slot, text, string):
+        # like BeautifulSoup's string= filter, only an anchor holding a single
+        # string matches, <a>Press <b>Conference</b></a> does not
+        if self.text is None or string == self.text:
+            self.results[slot] = self.hrefs[slot]
+
+    def extract(self, html):
+        return [href for href in _StreamingExtractor.extract(self, html) if href is not None]
+
+
+class TokenizerBackend(object):
+    '''
+    Streaming backend on the standard library tokenizer. Keeps only the
+    elements asked for and stops reading once the article div is closed
+    '''
+
+    def paragraphs(self, html):
+        return [text.strip() for text in _ParagraphExtractor().extract(html)]
+
+    def article_paragraphs(self, html, div_class):
+        return _ArticleExtractor(div_class).extract(html)
+
+    def links(self, html, href_pattern=None, text=None):
+        return _LinkExtractor(href_pattern, text).extract(html)
+
+
+def _lxml_root(html):
+    root = lxml.html.fromstring(html)
+    # text_content() would include these, get_text() does not. drop_tree()
+    # keeps the text that follows the dropped element
+    for element in list(root.iter(*NON_TEXT_ELEMENTS)):
+        element.drop_tree()
+    return root
+
+
+def _lxml_string(element):
+    # BeautifulSoup's .string: the only string, through single-child elements
+    children = list(element)
+    if not children:
+        return element.text
+    if len(children) == 1 and not element.text and not children[0].tail:
+        child = children[0]
+        if not isinstance(child.tag, str):
+            # comment or processing instruction
+            return child.text
+        return _lxml_string(child)
+    return None
+
+
+class LxmlBackend(object):
+    '''
+    Parses with libxml2 through lxml and only walks the elements asked for.
+    Opt-in only: libxml2 repairs broken markup its own way (it closes an
+    open <p> at the next <p> or <div>), so its text can differ from
+    BeautifulSoup's. Run benchmark_html_extraction.py before relying on it
+    '''
+
+    def paragraphs(self, html):
+        root = _lxml_root(html)
+        return [p.text_content().strip() for p in root.iter('p')]
+
+    def article_paragraphs(self, html, div_class):
+        root = _lxml_root(html)
+        for div in root.iter('div'):
+            if _class_matches(div.get('class'), div_class):
+                return [p.text_content() for p in div.iter('p')]
+        return None
+
+    def links(self, html, href_pattern=None, text=None):
+        root = _lxml_root(html)
+        href_pattern = _compile(href_pattern)
+        hrefs = []
+        for anchor in root.iter('a'):
+            href = anchor.get('href')
+            if href is None:
+                continue
+            if href_pattern is not None and not href_pattern.search(href):
+                continue
+            if text is not None and _lxml_string(anchor) != text:
+                continue
+            hrefs.append(href)
+        return hrefs
+
+
+BACKENDS = {
+    'bs4': BeautifulSoupBackend(),
+    'tokenizer': TokenizerBackend(),
+}
+if lxml is not None:
+    BACKENDS['lxml'] = LxmlBackend()
+
+# the tokenizer is checked against BeautifulSoup by benchmark_html_extraction.py,
+# lxml gives different text on broken markup and has to be asked for explicitly
+DEFAULT_BACKEND = 'tokenizer'
+FALLBACK_BACKEND = 'bs4'
+# backends that must give the same output as BeautifulSoup
+PARITY_BACKENDS = ['tokenizer']
+
+
+def _run(method, backend, *args):
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError("Unknown HTML backend '{}', available: {}".format(name, sorted(BACKENDS)))
+    try:
+        return getattr(BACKENDS[name], method)(*args)
+    except Exception as e:
+        if name == FALLBACK_BACKEND:
+            raise
+        print("HTML backend '{}' failed ({}), falling back to {}".format(name, e, FALLBACK_BACKEND))
+        return getattr(BACKENDS[FALLBACK_BACKEND], method)(*args)
+
+
+def paragraphs(html, backend=None):
+    '''
+    Returns the stripped text of every <p> in the page
+    '''
+    return _run('paragraphs', backend, html)
+
+
+def article_paragraphs(html, div_class, backend=None):
+    '''
+    Returns the text of every <p> inside the first div with class div_class,
+    or None if the page has no such div
+    '''
+    return _run('article_paragraphs', backend, html, div_class)
+
+
+def links(html, href_pattern=None, text=None, backend=None):
+    '''
+    Returns the href of every anchor whose href matches href_pattern and
+    that holds the single string text, like BeautifulSoup's string= filter
+    (either filter can be left out)
+    '''
+    return _run('links', backend, html, href_pattern, text)
@@ -0,0 +1,254 @@
+import importlib.util
+import os
+import sys
+import pandas as pd
+
+# Arrow-backed strings store the text buffers contiguously instead of one
+# Python object per row. pyarrow is only imported for parquet files, so
+# writing csv keeps working without it
+STRING_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') else 'string'
+
+# Columns holding the full document text. These are the heavy ones and can be
+# left out of a load and attached later with load_text_columns()
+TEXT_COLUMNS = ['text', 'statements', 'press_conferences']
+
+# Free-form strings that are (mostly) unique per row
+STRING_COLUMNS = ['title', 'link']
+
+# Labels with a fixed vocabulary: FinBERT tone labels and the
+# hawkish/dovish classifications from the notebook
+CLASSIFICATION_LABELS = ['hawkish', 'dovish', 'neutral', 'unknown']
+LABEL_CATEGORIES = {
+    'polarity': ['Positive', 'Negative', 'Neutral'],
+    'classification': CLASSIFICATION_LABELS,
+    'classification_w': CLASSIFICATION_LABELS,
+    'classification_s': CLASSIFICATION_LABELS,
+}
+
+# Labels with an open vocabulary that still repeat a lot across rows
+OPEN_CATEGORY_COLUMNS = ['speaker']
+
+FLOAT_COLUMNS = ['score', 'hawkish_similarity', 'dovish_similarity']
+CLASS_COLUMNS = ['classification_numeric', 'classification_s_numeric']
+COUNT_COLUMNS = ['dovish_count', 'hawkish_count']
+DATE_COLUMNS = ['date']
+
+
+def _to_int(series, dtype):
+    '''
+    casts to a numpy integer dtype, falling back to the nullable pandas
+    equivalent when the column has missing values
+    '''
+    series = pd.to_numeric(series)
+    if series.isna().any():
+        return series.astype(dtype.capitalize())
+    return series.astype(dtype)
+
+
+def enforce_schema(df):
+    '''
+    Returns a copy of df with the compact dtypes applied to every known column
+    that is present. Unknown columns are left untouched so the per-dataset
+    tables (speeches, minutes, press conferences) all go through the same path
+
+    Raises ValueError if a fixed-vocabulary label column has unexpected values,
+    rather than silently turning them into NaN
+    '''
+    df = df.copy()
+    for column in df.columns:
+        if column in TEXT_COLUMNS or column in STRING_COLUMNS:
+            df[column] = df[column].astype(STRING_DTYPE)
+        elif column in LABEL_CATEGORIES:
+            categories = LABEL_CATEGORIES[column]
+            unexpected = set(df[column].dropna().astype(str)) - set(categories)
+            if unexpected:
+                raise ValueError("Unexpected labels in column '{}': {}".format(column, sorted(unexpected)))
+            df[column] = df[column].astype(pd.CategoricalDtype(categories))
+        elif column in OPEN_CATEGORY_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column in FLOAT_COLUMNS:
+            df[column] = pd.to_numeric(df[column]).astype('float32')
+        elif column in CLASS_COLUMNS:
+            df[column] = _to_int(df[column], 'int8')
+        elif column in COUNT_COLUMNS:
+            df[column] = _to_int(df[column], 'int32')
+        elif column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def _columns_in(path):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _read(path, columns):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    # give the csv parser the compact dtypes up front. The default C engine
+    # still reads the strings as Python objects and converts each column once
+    # it is parsed, so the peak during a csv load is higher than the result.
+    # Use the parquet copy when that matters
+    dtype = {}
+    for column in columns:
+        if column in TEXT_COLUMNS or column in STRING_COLUMNS:
+            dtype[column] = STRING_DTYPE
+        elif column in LABEL_CATEGORIES or column in OPEN_CATEGORY_COLUMNS:
+            dtype[column] = 'category'
+    return pd.read_csv(path, usecols=columns, dtype=dtype)
+
+
+def load_scored_table(path, load_text=True, verbose=False):
+    '''
+    Returns a scored document table (csv or parquet) with the compact schema applied
+
+    With load_text=False the text columns are skipped entirely, which is
+    enough for the plotting and correlation work. They can be attached
+    later with load_text_columns(), rows line up by position
+    '''
+    columns = _columns_in(path)
+    if not load_text:
+        columns = [column for column in columns if column not in TEXT_COLUMNS]
+    df = enforce_schema(_read(path, columns))
+    if verbose:
+        print("Loaded", len(df), "rows from", path, "-", memory_mb(df), "MB")
+    return df
+
+
+def load_text_columns(path):
+    '''
+    Returns only the text columns of a scored document table, for use with a
+    table loaded with load_text=False:
+        df = df.join(load_text_columns(path))
+    '''
+    columns = [column for column in _columns_in(path) if column in TEXT_COLUMNS]
+    return enforce_schema(_read(path, columns))
+
+
+def _to_arrow(df, index=False):
+    '''
+    converts an already enforced frame to an arrow table. Categories are
+    written as plain strings (parquet dictionary-encodes them anyway) so that
+    tables written at different times always share one schema
+    '''
+    import pyarrow as pa
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(STRING_DTYPE)
+    return pa.Table.from_pandas(df, preserve_index=index)
+
+
+def write_scored_table(df, path, index=False, verbose=False):
+    '''
+    Writes a scored document table with the compact schema enforced. A
+    .parquet path keeps the dtypes on disk, anything else is written as csv
+    so the existing scripts can read it unchanged
+    '''
+    df = enforce_schema(df)
+    if verbose:
+        print("Writing to", path)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        pq.write_table(_to_arrow(df, index=index), path)
+    else:
+        df.to_csv(path, index=index)
+    return df
+
+
+class ChunkedTableWriter(object):
+    '''
+    Appends records to a scored table on disk a chunk at a time, so only one
+    chunk is ever held in memory. Each chunk goes through enforce_schema.
+    Any existing file at path is removed on open, so a run that writes no
+    rows does not leave an earlier run's table behind
+    Example Usage:
+        with ChunkedTableWriter("./all_fed_speeches.csv", chunk_size=100) as writer:
+            for record in records:
+                writer.append(record)
+    '''
+
+    def __init__(self, path, chunk_size=100, index=True, verbose=True):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.index = index
+        self.verbose = verbose
+        self.rows = []
+        self.rows_written = 0
+        self._parquet_writer = None
+        if os.path.exists(path):
+            os.remove(path)
+
+    def append(self, record):
+        self.rows.append(record)
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        index = range(self.rows_written, self.rows_written + len(self.rows))
+        df = enforce_schema(pd.DataFrame(self.rows, index=index))
+        if self.path.endswith('.parquet'):
+            table = _to_arrow(df, index=self.index)
+            if self._parquet_writer is None:
+                import pyarrow.parquet as pq
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            # the first chunk truncates the file and writes the header
+            first = self.rows_written == 0
+            df.to_csv(self.path, mode='w' if first else 'a', header=first, index=self.index)
+        self.rows_written += len(self.rows)
+        self.rows = []
+        if self.verbose:
+            print("Wrote", self.rows_written, "rows to", self.path)
+
+    def close(self):
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_mb(df):
+    # rounded, for display only
+    return round(memory_bytes(df) / 2**20, 2)
+
+
+def memory_report(before, after):
+    '''
+    Prints the deep memory usage of two versions of the same table and
+    returns both in bytes. The savings are worked out from the exact byte
+    counts, so small tables are reported correctly too
+    '''
+    before_bytes, after_bytes = memory_bytes(before), memory_bytes(after)
+    saved = 100 * (1 - after_bytes / before_bytes) if before_bytes else 0.0
+    print("Memory usage: {:.2f} MB -> {:.2f} MB ({} -> {} bytes, {:.1f}% saved)".format(
+        before_bytes / 2**20, after_bytes / 2**20, before_bytes, after_bytes, saved))
+    return before_bytes, after_bytes
+
+
+if __name__ == '__main__':
+    # Example Usage: python scored_table.py FOMC_classification_results.csv FOMC_classification_results.parquet
+    input_file = sys.argv[1] if len(sys.argv) > 1 else 'FOMC_classification_results.csv'
+    output_file = sys.argv[2] if len(sys.argv) > 2 else input_file.rsplit('.', 1)[0] + '.parquet'
+
+    naive_df = pd.read_csv(input_file)
+    df = load_scored_table(input_file)
+    memory_report(naive_df, df)
+    print("Without text columns:", memory_mb(load_scored_table(input_file, load_text=False)), "MB")
+
+    write_scored_table(df, output_file, verbose=True)